@@ -1,13 +1,59 @@
 import os
+import io
+import sys
+import hashlib
+import pickle
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from tree_sitter import Language, Parser
 import tree_sitter_python as tspython
-from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Iterator, Union
 import smell_detector
 
+try:
+    import numpy as np
+except ImportError:
+    # Optional: thresholds are checked with plain Python comparisons instead
+    np = None
 
-@dataclass
+
+# Control flow structures that increase nesting
+NESTING_TYPES = frozenset({'if_statement', 'for_statement', 'while_statement',
+                           'with_statement', 'try_statement'})
+
+# Parameter nodes counted towards a function's parameter count
+PARAMETER_TYPES = frozenset({'identifier', 'typed_parameter', 'default_parameter'})
+
+# The same node types as ids, for comparing against node.kind_id
+NESTING_KINDS = frozenset(smell_detector.kind_id(t) for t in NESTING_TYPES)
+PARAMETER_KINDS = frozenset(smell_detector.kind_id(t) for t in PARAMETER_TYPES)
+
+# Directories never scanned for Python files
+IGNORED_DIRS = frozenset({'.git', '__pycache__', '.venv', 'venv', '.tox', '.nox',
+                          '.mypy_cache', '.pytest_cache', 'node_modules'})
+
+# Where --cache stores analysis results between runs
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'smell_detector')
+
+# Bump when the cached results format or detection logic changes
+CACHE_VERSION = 1
+
+# Default detector thresholds
+LONG_METHOD_THRESHOLD = 50
+PARAMETER_THRESHOLD = 5
+NESTING_THRESHOLD = 4
+
+# Files with fewer functions than this are thresholded without numpy
+VECTORIZE_MIN_FUNCTIONS = 64
+
+SEVERITY_EMOJI = {'low': '🟢', 'medium': '🟡', 'high': '🔴'}
+
+# Subtrees smaller than this (in bytes) are cheaper to re-walk than to cache
+NEST_CACHE_MIN_BYTES = 256
+
+
+@dataclass(slots=True)
 class CodeSmell:
     """Represents a detected code smell"""
     smell_type: str
@@ -18,9 +64,323 @@ class CodeSmell:
     details: Dict
 
 
+# details key holding the measured value for each smell type
+DETAIL_KEYS = {
+    'long_method': 'line_count',
+    'too_many_parameters': 'param_count',
+    'deep_nesting': 'nesting_depth',
+}
+
+
+def _describe_long_method(line_count, threshold):
+    """Severity and message for a long method"""
+    return ('high' if line_count > 100 else 'medium',
+            f'Function is {line_count} lines long (threshold: {threshold})')
+
+
+def _describe_too_many_parameters(param_count, threshold):
+    """Severity and message for a function with too many parameters"""
+    return ('medium' if param_count <= 7 else 'high',
+            f'Function has {param_count} parameters (threshold: {threshold})')
+
+
+def _describe_deep_nesting(max_depth, threshold):
+    """Severity and message for a function with too deep nesting"""
+    return ('high' if max_depth > 5 else 'medium',
+            f'Function has nesting depth of {max_depth} (threshold: {threshold})')
+
+
+def _iter_py_files(root: str) -> Iterator[str]:
+    """
+    Yield the paths of all Python files under root
+    Uses os.scandir so directory entries come with their type already known,
+    and skips IGNORED_DIRS
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            # Unreadable directories are skipped, as with Path.rglob
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        stack.append(entry.path)
+                elif entry.name.endswith('.py') and entry.is_file():
+                    yield entry.path
+
+
+def _function_metrics(tree) -> tuple:
+    """
+    Measure every function in a tree in one cursor walk
+    Returns (nodes, line_counts, param_counts, depths): function nodes in source
+    order plus one int column per metric. Nesting depth is computed bottom-up as
+    each node's height in nesting statements, so every node is visited once.
+    """
+    functions = []
+    line_counts = array('i')
+    param_counts = array('i')
+    depths = array('i')
+    # Indices of the functions enclosing the current node
+    func_stack = []
+    # Deepest nesting found so far below each node on the current path
+    child_heights = []
+
+    # Local bindings: the loop body runs once per node in the file
+    nesting_kinds = NESTING_KINDS
+    parameter_kinds = PARAMETER_KINDS
+    function_kind = smell_detector.KIND_FUNCTION_DEFINITION
+    parameters_kind = smell_detector.KIND_PARAMETERS
+    push_height = child_heights.append
+    pop_height = child_heights.pop
+
+    cursor = tree.walk()
+    while True:
+        # Entering a node
+        node = cursor.node
+        node_kind = node.kind_id
+        push_height(0)
+        if node_kind == function_kind:
+            func_stack.append(len(functions))
+            functions.append(node)
+            line_counts.append(node.end_point[0] - node.start_point[0] + 1)
+            param_counts.append(0)
+            depths.append(0)
+        elif node_kind == parameters_kind and func_stack:
+            count = 0
+            for c in node.children:
+                if c.kind_id in parameter_kinds:
+                    count += 1
+            param_counts[func_stack[-1]] = count
+
+        if cursor.goto_first_child():
+            continue
+
+        # Leaving this node, then every ancestor whose last child is done
+        while True:
+            height = pop_height() + (node_kind in nesting_kinds)
+            if child_heights and height > child_heights[-1]:
+                child_heights[-1] = height
+            if node_kind == function_kind:
+                depths[func_stack.pop()] = height
+
+            if cursor.goto_next_sibling():
+                break
+            if not cursor.goto_parent():
+                return functions, line_counts, param_counts, depths
+            node_kind = cursor.node.kind_id
+
+
+class SmellTable:
+    """
+    Detected code smells stored column-wise
+    Avoids one CodeSmell and one details dict per smell. It stands in for
+    the List[CodeSmell] that analyze_file used to return: indexing, slicing
+    and iterating yield CodeSmell objects built on demand, and append,
+    extend, + and == accept CodeSmell objects and lists of them. Only the
+    smell types in DETAIL_KEYS can be stored.
+    """
+
+    def __init__(self, smells=()):
+        self.smell_type: List[str] = []
+        self.severity: List[str] = []
+        self.line = array('i')
+        self.column = array('i')
+        self.function_name: List[str] = []
+        self.message: List[str] = []
+        # Measured value and threshold, used to rebuild details
+        self.value = array('i')
+        self.threshold = array('i')
+        self.extend(smells)
+
+    def append(self, smell_type, severity=None, location=None, function_name=None,
+               message=None, value=None, threshold=None):
+        """Add one smell to the table, given as its fields or as a CodeSmell"""
+        if isinstance(smell_type, CodeSmell):
+            smell = smell_type
+            if smell.smell_type not in DETAIL_KEYS:
+                raise ValueError(f"SmellTable cannot store smell type {smell.smell_type!r}")
+            smell_type, severity, location = smell.smell_type, smell.severity, smell.location
+            function_name, message = smell.function_name, smell.message
+            value = smell.details[DETAIL_KEYS[smell_type]]
+            threshold = smell.details['threshold']
+
+        self.smell_type.append(smell_type)
+        self.severity.append(severity)
+        self.line.append(location[0])
+        self.column.append(location[1])
+        self.function_name.append(function_name)
+        self.message.append(message)
+        self.value.append(value)
+        self.threshold.append(threshold)
+
+    def extend(self, smells):
+        """Add every CodeSmell from an iterable, or every row of another table"""
+        if isinstance(smells, SmellTable):
+            for name in ('smell_type', 'severity', 'line', 'column', 'function_name',
+                         'message', 'value', 'threshold'):
+                getattr(self, name).extend(getattr(smells, name))
+            return
+        for smell in smells:
+            self.append(smell)
+
+    def rows(self) -> Iterator[tuple]:
+        """Iterate (smell_type, severity, line, column, function_name, message) without building CodeSmells"""
+        return zip(self.smell_type, self.severity, self.line, self.column,
+                   self.function_name, self.message)
+
+    def copy(self) -> 'SmellTable':
+        """Return an independent copy of the table"""
+        table = SmellTable()
+        table.smell_type = list(self.smell_type)
+        table.severity = list(self.severity)
+        table.line = array('i', self.line)
+        table.column = array('i', self.column)
+        table.function_name = list(self.function_name)
+        table.message = list(self.message)
+        table.value = array('i', self.value)
+        table.threshold = array('i', self.threshold)
+        return table
+
+    def __len__(self):
+        return len(self.smell_type)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Slicing a list of smells gave a list, so keep doing that
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        smell_type = self.smell_type[index]
+        return CodeSmell(
+            smell_type=smell_type,
+            severity=self.severity[index],
+            location=(self.line[index], self.column[index]),
+            function_name=self.function_name[index],
+            message=self.message[index],
+            details={DETAIL_KEYS[smell_type]: self.value[index],
+                     'threshold': self.threshold[index]}
+        )
+
+    def __iter__(self) -> Iterator[CodeSmell]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (SmellTable, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __add__(self, other) -> List[CodeSmell]:
+        # Concatenation gives a list, as it did when results were lists
+        if isinstance(other, (SmellTable, list, tuple)):
+            return list(self) + list(other)
+        return NotImplemented
+
+    def __radd__(self, other) -> List[CodeSmell]:
+        if isinstance(other, (list, tuple)):
+            return list(other) + list(self)
+        return NotImplemented
+
+    def __repr__(self):
+        return f'SmellTable({list(self)!r})'
+
+
 class PrimitiveCodeSmellDetector(smell_detector.CodeSmellDetector):
-    def __init__(self):
+    # Most analysis results kept in memory; least recently used go first
+    MAX_CACHED_RESULTS = 4096
+
+    def __init__(self, cache_dir: str = None):
         super().__init__()
+        # Analysis results keyed by a hash of the file contents
+        self._file_cache: Dict[bytes, SmellTable] = {}
+        # Also persist results here when set
+        self.cache_dir = cache_dir
+        # Latest digest of each file, tracked in incremental mode so a changed
+        # file's stale results can be evicted
+        self._path_digests: Dict[str, bytes] = {}
+        # Nesting depths as (node id, starting depth, limit) -> (node, depth); holding
+        # the node keeps its tree alive so the id cannot be reused by another tree
+        self._nest_cache: Dict[tuple, tuple] = {}
+
+    def parse_file(self, file_path: str, source: bytes = None) -> tuple:
+        """Parse a Python file and return the tree and source bytes"""
+        self._nest_cache.clear()
+        return super().parse_file(file_path, source)
+
+    def forget_file(self, file_path: str):
+        """Drop the cached tree and results for a file, e.g. after it is deleted"""
+        super().forget_file(file_path)
+        digest = self._path_digests.pop(file_path, None)
+        if digest is not None:
+            self._file_cache.pop(digest, None)
+
+    def forget_directory(self, directory_path: str):
+        """Drop the cached trees and results for every file under a directory"""
+        prefix = os.path.join(directory_path, '')
+        for file_path in [p for p in self._path_digests if p.startswith(prefix)]:
+            self.forget_file(file_path)
+        super().forget_directory(directory_path)
+
+    def worker_init_kwargs(self) -> dict:
+        """
+        Constructor arguments that recreate this detector in a pool worker
+        Subclasses with their own configuration should extend this
+        """
+        return {'cache_dir': self.cache_dir}
+
+    def _file_digest(self, source: bytes) -> bytes:
+        """Cache key for a file: its contents hashed together with CACHE_VERSION and the thresholds"""
+        salt = (f'{CACHE_VERSION}:{LONG_METHOD_THRESHOLD}:{PARAMETER_THRESHOLD}:'
+                f'{NESTING_THRESHOLD}').encode()
+        return hashlib.blake2b(source, digest_size=16, key=salt).digest()
+
+    def _load_cached(self, digest: bytes):
+        """Look up results for a file digest in memory, then on disk"""
+        smells = self._file_cache.pop(digest, None)
+        if smells is not None:
+            # Re-insert so dict order tracks how recently each entry was used
+            self._file_cache[digest] = smells
+        elif self.cache_dir:
+            cache_path = os.path.join(self.cache_dir, digest.hex() + '.pkl')
+            try:
+                with open(cache_path, 'rb') as f:
+                    smells = pickle.load(f)
+            except FileNotFoundError:
+                return None
+            except Exception:
+                # Corrupt or unreadable entry: treat as a miss and drop it
+                smells = None
+            if not isinstance(smells, SmellTable):
+                try:
+                    os.remove(cache_path)
+                except OSError:
+                    pass
+                return None
+            self._remember(digest, smells)
+        return smells
+
+    def _remember(self, digest: bytes, smells: SmellTable):
+        """Keep results in memory, evicting the least recently used beyond MAX_CACHED_RESULTS"""
+        self._file_cache[digest] = smells
+        while len(self._file_cache) > self.MAX_CACHED_RESULTS:
+            del self._file_cache[next(iter(self._file_cache))]
+
+    def _store_cached(self, digest: bytes, smells: SmellTable):
+        """Remember results for a file digest in memory and, if enabled, on disk"""
+        self._remember(digest, smells)
+        if self.cache_dir:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                cache_path = os.path.join(self.cache_dir, digest.hex() + '.pkl')
+                # Write then rename, so other workers never read a partial entry
+                tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(smells, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"Warning: could not write cache entry: {e}")
 
     def count_lines(self, node):
         """Count non-empty lines in a node"""
@@ -31,164 +391,361 @@ class PrimitiveCodeSmellDetector(smell_detector.CodeSmellDetector):
     def count_parameters(self, func_node):
         """Count the number of parameters in a function"""
         for child in func_node.children:
-            if child.type == 'parameters':
+            if child.kind_id == smell_detector.KIND_PARAMETERS:
                 # Count children that are identifiers or typed parameters
-                params = [c for c in child.children
-                          if c.type in ('identifier', 'typed_parameter', 'default_parameter')]
-                return len(params)
+                count = 0
+                for c in child.children:
+                    if c.kind_id in PARAMETER_KINDS:
+                        count += 1
+                return count
         return 0
 
-    def calculate_nesting_depth(self, node, current_depth=0):
-        """Calculate maximum nesting depth of control structures"""
+    def calculate_nesting_depth(self, node, current_depth=0, limit=None):
+        """Calculate maximum nesting depth of control structures
+
+        With a limit, the walk stops as soon as the depth exceeds it and the
+        returned depth is only a lower bound above the limit.
+        """
+        if limit is not None and current_depth > limit:
+            return current_depth
+
+        cacheable = node.end_byte - node.start_byte >= NEST_CACHE_MIN_BYTES
+        if cacheable:
+            key = (node.id, current_depth, limit)
+            cached = self._nest_cache.get(key)
+            # Nodes compare equal only within the same tree
+            if cached is not None and cached[0] == node:
+                return cached[1]
+
         max_depth = current_depth
 
-        # These are control flow structures that increase nesting
-        nesting_nodes = {'if_statement', 'for_statement', 'while_statement',
-                         'with_statement', 'try_statement'}
+        # Local bindings: this visits every node under the function
+        nesting_kinds = NESTING_KINDS
+        calculate = self.calculate_nesting_depth
 
         for child in node.children:
-            if child.type in nesting_nodes:
-                child_depth = self.calculate_nesting_depth(child, current_depth + 1)
-                max_depth = max(max_depth, child_depth)
-            else:
-                child_depth = self.calculate_nesting_depth(child, current_depth)
-                max_depth = max(max_depth, child_depth)
-
+            child_depth = calculate(child, current_depth + (child.kind_id in nesting_kinds), limit)
+            if child_depth > max_depth:
+                max_depth = child_depth
+                if limit is not None and max_depth > limit:
+                    break
+
+        if cacheable:
+            self._nest_cache[key] = (node, max_depth)
         return max_depth
 
-    def detect_long_method(self, func_node, threshold=50):
+    def detect_long_method(self, func_node, threshold=LONG_METHOD_THRESHOLD, line_count=None):
         """Detect if a method is too long"""
-        line_count = self.count_lines(func_node)
+        if line_count is None:
+            line_count = self.count_lines(func_node)
 
         if line_count > threshold:
+            severity, message = _describe_long_method(line_count, threshold)
             return CodeSmell(
                 smell_type='long_method',
-                severity='high' if line_count > 100 else 'medium',
+                severity=severity,
                 location=func_node.start_point,
                 function_name=self.get_function_name(func_node),
-                message=f'Function is {line_count} lines long (threshold: {threshold})',
+                message=message,
                 details={'line_count': line_count, 'threshold': threshold}
             )
         return None
 
-    def detect_too_many_parameters(self, func_node, threshold=5):
+    def detect_too_many_parameters(self, func_node, threshold=PARAMETER_THRESHOLD, param_count=None):
         """Detect if a function has too many parameters"""
-        param_count = self.count_parameters(func_node)
+        if param_count is None:
+            param_count = self.count_parameters(func_node)
 
         if param_count > threshold:
+            severity, message = _describe_too_many_parameters(param_count, threshold)
             return CodeSmell(
                 smell_type='too_many_parameters',
-                severity='medium' if param_count <= 7 else 'high',
+                severity=severity,
                 location=func_node.start_point,
                 function_name=self.get_function_name(func_node),
-                message=f'Function has {param_count} parameters (threshold: {threshold})',
+                message=message,
                 details={'param_count': param_count, 'threshold': threshold}
             )
         return None
 
-    def detect_deep_nesting(self, func_node, threshold=4):
+    def detect_deep_nesting(self, func_node, threshold=NESTING_THRESHOLD, max_depth=None):
         """Detect if a function has too deep nesting"""
-        max_depth = self.calculate_nesting_depth(func_node)
+        if max_depth is None:
+            # Stop early for functions within the threshold; only smells need the exact depth
+            if self.calculate_nesting_depth(func_node, limit=threshold) <= threshold:
+                return None
+            max_depth = self.calculate_nesting_depth(func_node)
 
         if max_depth > threshold:
+            severity, message = _describe_deep_nesting(max_depth, threshold)
             return CodeSmell(
                 smell_type='deep_nesting',
-                severity='high' if max_depth > 5 else 'medium',
+                severity=severity,
                 location=func_node.start_point,
                 function_name=self.get_function_name(func_node),
-                message=f'Function has nesting depth of {max_depth} (threshold: {threshold})',
+                message=message,
                 details={'nesting_depth': max_depth, 'threshold': threshold}
             )
         return None
 
-    def analyze_file(self, file_path: str) -> List[CodeSmell]:
-        """Analyze a single Python file for code smells"""
+    def _analyze_tree(self, tree) -> SmellTable:
+        """Run all detectors over every function in a parsed tree
+
+        _function_metrics measures every function in one walk; the
+        thresholds are then compared across whole metric columns and
+        smells appended to the table in source order.
+        """
+        functions, line_counts, param_counts, depths = _function_metrics(tree)
+
+        if np is not None and len(functions) >= VECTORIZE_MIN_FUNCTIONS:
+            long_mask = np.frombuffer(line_counts, dtype=np.intc) > LONG_METHOD_THRESHOLD
+            params_mask = np.frombuffer(param_counts, dtype=np.intc) > PARAMETER_THRESHOLD
+            deep_mask = np.frombuffer(depths, dtype=np.intc) > NESTING_THRESHOLD
+            flagged = np.flatnonzero(long_mask | params_mask | deep_mask).tolist()
+        else:
+            flagged = [i for i in range(len(functions))
+                       if line_counts[i] > LONG_METHOD_THRESHOLD
+                       or param_counts[i] > PARAMETER_THRESHOLD
+                       or depths[i] > NESTING_THRESHOLD]
+
+        smells = SmellTable()
+        for i in flagged:
+            node = functions[i]
+            name = self.get_function_name(node)
+            line_count = line_counts[i]
+            param_count = param_counts[i]
+            max_depth = depths[i]
+
+            if line_count > LONG_METHOD_THRESHOLD:
+                severity, message = _describe_long_method(line_count, LONG_METHOD_THRESHOLD)
+                smells.append('long_method', severity, node.start_point, name, message,
+                              line_count, LONG_METHOD_THRESHOLD)
+            if param_count > PARAMETER_THRESHOLD:
+                severity, message = _describe_too_many_parameters(param_count, PARAMETER_THRESHOLD)
+                smells.append('too_many_parameters', severity, node.start_point, name, message,
+                              param_count, PARAMETER_THRESHOLD)
+            if max_depth > NESTING_THRESHOLD:
+                severity, message = _describe_deep_nesting(max_depth, NESTING_THRESHOLD)
+                smells.append('deep_nesting', severity, node.start_point, name, message,
+                              max_depth, NESTING_THRESHOLD)
+
+        return smells
+
+    def analyze_file(self, file_path: str) -> SmellTable:
+        """Analyze a single Python file for code smells
+
+        Returns a SmellTable in place of the former List[CodeSmell]; it
+        indexes, iterates, compares and concatenates like that list.
+        Results are cached by a hash of the file contents, so unchanged
+        files are not parsed again.
+        """
         try:
-            tree, source_code = self.parse_file(file_path)
-            functions = self.get_function_nodes(tree)
-
-            smells = []
-
-            for func in functions:
-                # Run all detectors
-                detectors = [
-                    self.detect_long_method,
-                    self.detect_too_many_parameters,
-                    self.detect_deep_nesting
-                ]
-
-                for detector in detectors:
-                    smell = detector(func)
-                    if smell:
-                        smells.append(smell)
-
-            return smells
+            source = self.read_source(file_path)
+            digest = self._file_digest(source)
+            if self.incremental:
+                old_digest = self._path_digests.get(file_path)
+                if old_digest is not None and old_digest != digest:
+                    self._file_cache.pop(old_digest, None)
+                self._path_digests[file_path] = digest
+            smells = self._load_cached(digest)
+            if smells is None:
+                tree, source = self.parse_file(file_path, source)
+                smells = self._analyze_tree(tree)
+                self._store_cached(digest, smells)
+            return smells.copy()
 
         except Exception as e:
             print(f"Error analyzing {file_path}: {e}")
-            return []
+            return SmellTable()
+
+    def analyze_directory(self, directory_path: str,
+                          use_multiprocessing: bool = True) -> Dict[str, SmellTable]:
+        """Analyze all Python files in a directory
 
-    def analyze_directory(self, directory_path: str) -> Dict[str, List[CodeSmell]]:
-        """Analyze all Python files in a directory"""
+        Files are analyzed in parallel across a process pool unless
+        use_multiprocessing is False.
+        """
         results = {}
 
-        path = Path(directory_path)
-        for py_file in path.rglob('*.py'):
-            smells = self.analyze_file(str(py_file))
+        paths = _iter_py_files(directory_path)
+        if use_multiprocessing:
+            with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                     initializer=_init_worker,
+                                     initargs=(type(self), self.worker_init_kwargs())) as executor:
+                analyzed = list(executor.map(_analyze_one, paths, chunksize=16))
+        else:
+            analyzed = [(path, self.analyze_file(path)) for path in paths]
+
+        for path, smells in analyzed:
             if smells:
-                results[str(py_file)] = smells
+                results[path] = smells
 
         return results
 
-    def print_report(self, results: Dict[str, List[CodeSmell]]):
-        """Print a formatted report of detected code smells"""
+    def watch(self, directory_path: str):
+        """Analyze a directory, then re-analyze Python files as they change
+
+        Requires the optional watchdog package. Changed files are re-parsed
+        incrementally from their previous tree. Runs until interrupted.
+        """
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        detector = self
+        self.incremental = True
+        # Event paths are absolute, so cache keys must be too
+        directory_path = os.path.abspath(directory_path)
+
+        def is_ignored(path):
+            relative = os.path.relpath(path, directory_path)
+            return any(part in IGNORED_DIRS for part in relative.split(os.sep))
+
+        def reanalyze(file_path):
+            smells = detector.analyze_file(file_path)
+            if smells:
+                detector.print_report({file_path: smells})
+            else:
+                print(f"✅ No code smells detected in {file_path}")
+
+        class _ChangeHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                event_type = event.event_type
+                src_path = os.path.abspath(event.src_path)
+                dest_path = getattr(event, 'dest_path', '')
+                dest_path = os.path.abspath(dest_path) if dest_path else ''
+
+                if event_type in ('deleted', 'moved'):
+                    if event.is_directory:
+                        detector.forget_directory(src_path)
+                    else:
+                        detector.forget_file(src_path)
+                if event_type not in ('created', 'modified', 'moved'):
+                    return
+
+                target = dest_path or src_path
+                if is_ignored(target):
+                    return
+
+                if event.is_directory:
+                    # A directory moved in brings files that raise no events of their own
+                    if event_type in ('created', 'moved'):
+                        for file_path in _iter_py_files(target):
+                            reanalyze(file_path)
+                    return
+
+                if target.endswith('.py') and os.path.isfile(target):
+                    reanalyze(target)
+
+        # Analyze in-process so the trees stay cached for incremental re-parses
+        results = self.analyze_directory(directory_path, use_multiprocessing=False)
+        if results:
+            self.print_report(results)
+        else:
+            print("✅ No code smells detected!")
+
+        observer = Observer()
+        observer.schedule(_ChangeHandler(), directory_path, recursive=True)
+        observer.start()
+        print(f"\n👀 Watching {directory_path} for changes (Ctrl+C to stop)")
+        try:
+            while observer.is_alive():
+                observer.join(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            observer.stop()
+            observer.join()
+
+    def print_report(self, results: Dict[str, Union[SmellTable, List[CodeSmell]]]):
+        """Print a formatted report of detected code smells
+
+        The report is built in memory and written to stdout in one call.
+        """
         total_smells = sum(len(smells) for smells in results.values())
+        rule = "=" * 80
 
-        print("\n" + "=" * 80)
-        print(f"CODE SMELL DETECTION REPORT")
-        print("=" * 80)
-        print(f"Total files analyzed: {len(results)}")
-        print(f"Total code smells found: {total_smells}")
-        print("=" * 80 + "\n")
+        buf = io.StringIO()
+        write = buf.write
+
+        write(f"\n{rule}\n")
+        write("CODE SMELL DETECTION REPORT\n")
+        write(f"{rule}\n")
+        write(f"Total files analyzed: {len(results)}\n")
+        write(f"Total code smells found: {total_smells}\n")
+        write(f"{rule}\n\n")
 
         for file_path, smells in results.items():
-            print(f"\n📄 File: {file_path}")
-            print(f"   Found {len(smells)} smell(s)\n")
+            write(f"\n📄 File: {file_path}\n")
+            write(f"   Found {len(smells)} smell(s)\n\n")
+
+            if isinstance(smells, SmellTable):
+                rows = smells.rows()
+            else:
+                # Plain lists of CodeSmell are still accepted
+                rows = ((smell.smell_type, smell.severity, smell.location[0], smell.location[1],
+                         smell.function_name, smell.message) for smell in smells)
+
+            for smell_type, severity, line, column, function_name, message in rows:
+                emoji = SEVERITY_EMOJI.get(severity, '⚪')
+
+                write(f"   {emoji} {smell_type.upper()} [{severity}]\n"
+                      f"      Function: {function_name}\n"
+                      f"      Location: Line {line + 1}, Column {column}\n"
+                      f"      Message: {message}\n\n")
 
-            for smell in smells:
-                severity_emoji = {'low': '🟢', 'medium': '🟡', 'high': '🔴'}
-                emoji = severity_emoji.get(smell.severity, '⚪')
+        sys.stdout.write(buf.getvalue())
 
-                print(f"   {emoji} {smell.smell_type.upper()} [{smell.severity}]")
-                print(f"      Function: {smell.function_name}")
-                print(f"      Location: Line {smell.location[0] + 1}, Column {smell.location[1]}")
-                print(f"      Message: {smell.message}")
-                print()
+
+# Detector reused by every file a pool worker analyzes
+_worker_detector = None
+
+
+def _init_worker(detector_class: type, init_kwargs: dict):
+    """Build the detector and its parser once when a pool worker starts"""
+    global _worker_detector
+    _worker_detector = detector_class(**init_kwargs)
+    smell_detector.get_parser()
+
+
+def _analyze_one(file_path: str) -> tuple:
+    """Analyze a single file in a pool worker, returning (file_path, smells)"""
+    return file_path, _worker_detector.analyze_file(file_path)
 
 
 def main():
     """Main entry point"""
-    import sys
+    args = sys.argv[1:]
+    use_multiprocessing = '--no-mp' not in args
+    use_cache = '--cache' in args
+    watch = '--watch' in args
+    args = [arg for arg in args if arg not in ('--no-mp', '--cache', '--watch')]
 
-    detector = PrimitiveCodeSmellDetector()
+    detector = PrimitiveCodeSmellDetector(DEFAULT_CACHE_DIR if use_cache else None)
 
     # Example usage
-    if len(sys.argv) < 2:
-        print("Usage: python code_smell_detector.py <file_or_directory>")
+    if not args:
+        print("Usage: python code_smell_detector.py [--no-mp] [--cache] [--watch] <file_or_directory>")
         print("\nExample:")
         print("  python code_smell_detector.py my_script.py")
         print("  python code_smell_detector.py ./my_project")
+        print("  python code_smell_detector.py --no-mp ./my_project")
+        print("  python code_smell_detector.py --cache ./my_project")
+        print("  python code_smell_detector.py --watch ./my_project")
         return
 
-    target = sys.argv[1]
+    target = args[0]
 
     if os.path.isfile(target):
         # Analyze single file
         smells = detector.analyze_file(target)
         results = {target: smells} if smells else {}
+    elif os.path.isdir(target) and watch:
+        # Keep analyzing the directory as files change
+        detector.watch(target)
+        return
     elif os.path.isdir(target):
         # Analyze directory
-        results = detector.analyze_directory(target)
+        results = detector.analyze_directory(target, use_multiprocessing)
     else:
         print(f"Error: {target} is not a valid file or directory")
         return
@@ -1,6 +1,5 @@
 import os
 
-from sentence_transformers import SentenceTransformer
 from tree_sitter import Language, Parser
 import tree_sitter_python as tspython
 from pathlib import Path
@@ -8,7 +7,7 @@ from dataclasses import dataclass
 from typing import List, Dict
 
 import smell_detector
-@dataclass
+@dataclass(slots=True)
 class SOLIDCodeSmell:
     """Represents a detected code smell"""
     smell_type: str
@@ -20,7 +19,21 @@ class SOLIDCodeSmell:
 
 
 class SOLIDCodeSmellDetector(smell_detector.CodeSmellDetector):
-    def __init__(self):
+    # Shared by every detector instance; loading the model is expensive
+    _shared_embedder = None
+
+    def __init__(self, use_embeddings: bool = False):
         super().__init__()
-        #self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedder = None
+        if use_embeddings:
+            self.embedder = self._get_embedder()
+
+    @classmethod
+    def _get_embedder(cls):
+        """Load the sentence embedding model on first use"""
+        if cls._shared_embedder is None:
+            # Imported here: sentence_transformers pulls in torch at import time
+            from sentence_transformers import SentenceTransformer
+            cls._shared_embedder = SentenceTransformer('all-MiniLM-L6-v2')
+        return cls._shared_embedder
 
@@ -1,5 +1,11 @@
 import os
-from tree_sitter import Language, Parser
+import threading
+from tree_sitter import Language, Parser, Query
+try:
+    # py-tree-sitter >= 0.25 runs queries through a QueryCursor
+    from tree_sitter import QueryCursor
+except ImportError:
+    QueryCursor = None
 import tree_sitter_python as tspython
 from pathlib import Path
 from dataclasses import dataclass
@@ -7,7 +13,115 @@ from typing import List, Dict
 import re
 
 
-@dataclass
+PY_LANGUAGE = Language(tspython.language())
+
+
+def kind_id(node_type: str) -> int:
+    """Numeric id of a named node type, for comparing against node.kind_id"""
+    return PY_LANGUAGE.id_for_node_kind(node_type, True)
+
+
+# Integer compares are cheaper than string compares on node.type
+KIND_IDENTIFIER = kind_id('identifier')
+KIND_ATTRIBUTE = kind_id('attribute')
+KIND_BLOCK = kind_id('block')
+KIND_CALL = kind_id('call')
+KIND_FUNCTION_DEFINITION = kind_id('function_definition')
+KIND_CLASS_DEFINITION = kind_id('class_definition')
+KIND_PARAMETERS = kind_id('parameters')
+
+
+def _compile_query(source: str) -> Query:
+    """Compile a query against the Python grammar"""
+    if QueryCursor is not None:
+        return Query(PY_LANGUAGE, source)
+    return PY_LANGUAGE.query(source)
+
+
+def _captured_nodes(query: Query, node, capture_name: str) -> list:
+    """Return the nodes under node captured as capture_name, in source order"""
+    if QueryCursor is not None:
+        captures = QueryCursor(query).captures(node)
+    else:
+        captures = query.captures(node)
+
+    # Older bindings return (node, name) pairs instead of a dict
+    if isinstance(captures, dict):
+        nodes = captures.get(capture_name, [])
+    else:
+        nodes = [captured for captured, name in captures if name == capture_name]
+    return sorted(nodes, key=lambda n: n.start_byte)
+
+
+_CAMEL_CASE_BOUNDARY = re.compile('([a-z])([A-Z])')
+_UNDERSCORE_TO_SPACE = str.maketrans('_', ' ')
+
+# Compiled once; queries are reusable across trees and threads
+_FUNCTION_QUERY = _compile_query('(function_definition) @function')
+_CLASS_QUERY = _compile_query('(class_definition) @class')
+
+def _common_prefix_length(a: bytes, b: bytes) -> int:
+    """Length of the longest common prefix, found by bisecting slice compares"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix_length(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the longest common suffix, capped at limit"""
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid:len(a) - low] == b[len(b) - mid:len(b) - low]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _point_at(source: bytes, byte: int) -> tuple:
+    """Convert a byte offset into a (row, column) point"""
+    row = source.count(b'\n', 0, byte)
+    column = byte - (source.rfind(b'\n', 0, byte) + 1)
+    return row, column
+
+
+def _source_edit(old: bytes, new: bytes) -> dict:
+    """Describe the single edit that turns old into new, as Tree.edit arguments"""
+    start = _common_prefix_length(old, new)
+    suffix = _common_suffix_length(old, new, min(len(old), len(new)) - start)
+    old_end = len(old) - suffix
+    new_end = len(new) - suffix
+    return {
+        'start_byte': start,
+        'old_end_byte': old_end,
+        'new_end_byte': new_end,
+        'start_point': _point_at(old, start),
+        'old_end_point': _point_at(old, old_end),
+        'new_end_point': _point_at(new, new_end),
+    }
+
+
+# Parsers are not safe to share between threads, so each thread gets its own
+_thread_local = threading.local()
+
+
+def get_parser() -> Parser:
+    """Return the calling thread's Python parser, creating it on first use"""
+    parser = getattr(_thread_local, 'parser', None)
+    if parser is None:
+        parser = Parser()
+        parser.language = PY_LANGUAGE
+        _thread_local.parser = parser
+    return parser
+
+
+@dataclass(slots=True)
 class CodeSmell:
     """Represents a detected code smell"""
     smell_type: str
@@ -19,38 +133,99 @@ class CodeSmell:
 
 
 class CodeSmellDetector:
+    # Most files whose tree is kept for incremental re-parsing; least recently parsed go first
+    MAX_CACHED_TREES = 1024
+
     def __init__(self):
-        self.parser = Parser()
-        PY_LANGUAGE = Language(tspython.language())
-        self.parser.language= PY_LANGUAGE
+        # Function/class names as node id -> (node, name). Holding the node keeps
+        # its tree alive, so the id cannot be reused by another tree while cached
+        self._name_cache = {}
+        # When enabled, keep each file's last tree and source to re-parse incrementally
+        self.incremental = False
+        self._tree_cache: Dict[str, tuple] = {}
 
-    def parse_file(self, file_path: str) -> tuple:
-        """Parse a Python file and return the tree and source code"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            source_code = f.read()
+    @property
+    def parser(self) -> Parser:
+        """The parser for the calling thread"""
+        return get_parser()
 
-        tree = self.parser.parse(bytes(source_code, 'utf8'))
-        return tree, source_code
+    def read_source(self, file_path: str) -> bytes:
+        """Read a Python file as raw bytes"""
+        # tree-sitter works on UTF-8 bytes, so skip decoding to str
+        with open(file_path, 'rb') as f:
+            return f.read()
 
-    def get_function_nodes(self, tree):
-        """Extract all function definition nodes from the tree"""
-        functions = []
+    def parse_file(self, file_path: str, source: bytes = None) -> tuple:
+        """Parse a Python file and return the tree and source bytes
+
+        Pass source when the file has already been read.
+        """
+        if source is None:
+            source = self.read_source(file_path)
+
+        # Release the previous file's trees held by the name cache
+        self._name_cache.clear()
+
+        old_tree = None
+        if self.incremental:
+            cached = self._tree_cache.get(file_path)
+            if cached is not None:
+                old_tree, old_source = cached
+                if old_source == source:
+                    return old_tree, source
+                old_tree.edit(**_source_edit(old_source, source))
+
+        parser = self.parser
+        # Drop any state left behind by an earlier parse on this thread
+        parser.reset()
+        if old_tree is not None:
+            # Subtrees outside the edited range are reused from the old tree
+            tree = parser.parse(source, old_tree)
+        else:
+            tree = parser.parse(source)
+
+        if self.incremental:
+            # Re-insert so dict order tracks how recently each file was parsed
+            self._tree_cache.pop(file_path, None)
+            self._tree_cache[file_path] = (tree, source)
+            while len(self._tree_cache) > self.MAX_CACHED_TREES:
+                del self._tree_cache[next(iter(self._tree_cache))]
+        return tree, source
 
-        def traverse(node):
-            if node.type == 'function_definition':
-                functions.append(node)
-            for child in node.children:
-                traverse(child)
+    def forget_file(self, file_path: str):
+        """Drop the cached tree for a file, e.g. after it is deleted"""
+        self._tree_cache.pop(file_path, None)
 
-        traverse(tree.root_node)
-        return functions
+    def forget_directory(self, directory_path: str):
+        """Drop the cached trees for every file under a directory"""
+        prefix = os.path.join(directory_path, '')
+        for file_path in [p for p in self._tree_cache if p.startswith(prefix)]:
+            self.forget_file(file_path)
+
+    def _cached_name(self, node):
+        """Return the cached name for node, or None if it is not cached"""
+        entry = self._name_cache.get(node.id)
+        # Nodes compare equal only within the same tree, which rules out
+        # subtrees shared with another tree by an incremental re-parse
+        if entry is not None and entry[0] == node:
+            return entry[1]
+        return None
+
+    def get_function_nodes(self, tree):
+        """Extract all function definition nodes from the tree"""
+        return _captured_nodes(_FUNCTION_QUERY, tree.root_node, 'function')
 
     def get_function_name(self, func_node):
         """Extract function name from function node"""
-        for child in func_node.children:
-            if child.type == 'identifier':
-                return child.text.decode('utf8')
-        return 'unknown'
+        name = self._cached_name(func_node)
+        if name is None:
+            name = 'unknown'
+            for child in func_node.children:
+                if child.kind_id == KIND_IDENTIFIER:
+                    name = child.text.decode('utf8')
+                    break
+            self._name_cache[func_node.id] = (func_node, name)
+        return name
 
     def get_class_methods(self, class_node):
         """
@@ -60,9 +235,9 @@ class CodeSmellDetector:
 
         for child in class_node.children:
 
-            if child.type == 'block':
+            if child.kind_id == KIND_BLOCK:
                 for item in child.children:
-                    if item.type == 'function_definition':
+                    if item.kind_id == KIND_FUNCTION_DEFINITION:
                         methods.append(item)
 
         return methods
@@ -72,11 +247,11 @@ class CodeSmellDetector:
         Extract function name from a call node
         """
         for child in call_node.children:
-            if child.type == 'attribute':
+            if child.kind_id == KIND_ATTRIBUTE:
                 for subchild in child.children:
-                    if subchild.type == 'identifier':
+                    if subchild.kind_id == KIND_IDENTIFIER:
                         return subchild.text.decode('utf8')
-            elif child.type == 'identifier':
+            elif child.kind_id == KIND_IDENTIFIER:
                 return child.text.decode('utf8')
         return None
 
@@ -84,10 +259,10 @@ class CodeSmellDetector:
         """
         Split camelCase or snake_case into words
         """
-        name = name.replace('_', ' ')
+        name = name.translate(_UNDERSCORE_TO_SPACE)
 
         # Insert space before capital letters
-        name = re.sub('([a-z])([A-Z])', r'\1 \2', name)
+        name = _CAMEL_CASE_BOUNDARY.sub(r'\1 \2', name)
 
         # Split and lowercase
         words = name.lower().split()
@@ -98,24 +273,19 @@ class CodeSmellDetector:
         """
         Extract class name from class definition node
         """
-        for child in class_node.children:
-            if child.type == 'identifier':
-                return child.text.decode('utf8')
-        return 'UnknownClass'
+        name = self._cached_name(class_node)
+        if name is None:
+            name = 'UnknownClass'
+            for child in class_node.children:
+                if child.kind_id == KIND_IDENTIFIER:
+                    name = child.text.decode('utf8')
+                    break
+            self._name_cache[class_node.id] = (class_node, name)
+        return name
 
     def get_class_nodes(self, tree):
         """
         Extract all class definition nodes from tree
         Similar to get_function_nodes but for classes
         """
-        classes = []
-
-        def traverse(node):
-            if node.type == 'class_definition':
-                classes.append(node)
-            for child in node.children:
-                traverse(child)
-
-        traverse(tree.root_node)
-        return classes
-
+        return _captured_nodes(_CLASS_QUERY, tree.root_node, 'class')
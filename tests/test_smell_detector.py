@@ -0,0 +1,169 @@
+"""Tests for the primitive code smell detector"""
+import random
+
+import pytest
+
+import smell_detector
+from Primitive_code_smells_detector import CodeSmell, PrimitiveCodeSmellDetector, SmellTable
+
+
+LONG_BODY = ''.join(f'    x{i} = {i}\n' for i in range(60))
+
+FIXTURE = f'''def long_function():
+{LONG_BODY}    return x0
+
+
+def many_params(a, b, c, d, e, f, g):
+    return a
+
+
+def deeply_nested(x):
+    if x:
+        for i in x:
+            while i:
+                with i:
+                    try:
+                        if i:
+                            pass
+                    except ValueError:
+                        pass
+
+
+def clean(a):
+    return a
+'''
+
+EXPECTED = [
+    ('long_method', 'medium', 'long_function'),
+    ('too_many_parameters', 'medium', 'many_params'),
+    ('deep_nesting', 'high', 'deeply_nested'),
+]
+
+
+def _summary(smells):
+    return [(smell.smell_type, smell.severity, smell.function_name) for smell in smells]
+
+
+@pytest.fixture
+def detector():
+    return PrimitiveCodeSmellDetector()
+
+
+def test_analyze_file_finds_known_smells(detector, tmp_path):
+    path = tmp_path / 'sample.py'
+    path.write_text(FIXTURE)
+
+    smells = detector.analyze_file(str(path))
+
+    assert _summary(smells) == EXPECTED
+    assert smells[0].details == {'line_count': 62, 'threshold': 50}
+    assert smells[1].details == {'param_count': 7, 'threshold': 5}
+    assert smells[2].details == {'nesting_depth': 6, 'threshold': 4}
+
+
+@pytest.mark.parametrize('use_multiprocessing', [True, False])
+def test_analyze_directory(detector, tmp_path, use_multiprocessing):
+    (tmp_path / 'pkg').mkdir()
+    (tmp_path / 'pkg' / 'smelly.py').write_text(FIXTURE)
+    (tmp_path / 'clean.py').write_text('def clean(a):\n    return a\n')
+    # Ignored directories are not scanned
+    (tmp_path / '.venv').mkdir()
+    (tmp_path / '.venv' / 'vendored.py').write_text(FIXTURE)
+
+    results = detector.analyze_directory(str(tmp_path), use_multiprocessing)
+
+    assert list(results) == [str(tmp_path / 'pkg' / 'smelly.py')]
+    assert _summary(next(iter(results.values()))) == EXPECTED
+
+
+def test_incremental_parse_matches_fresh_parse(detector, tmp_path):
+    rng = random.Random(1234)
+    snippets = [b'x = 1\n', b'    ', b'if y:\n    pass\n', b'def f(a, b):\n', b')', b'\n', b'#']
+    path = tmp_path / 'edited.py'
+    source = FIXTURE.encode()
+    detector.incremental = True
+    detector.parse_file(str(path), source)
+
+    for _ in range(200):
+        start = rng.randrange(len(source) + 1)
+        end = min(len(source), start + rng.randrange(20))
+        source = source[:start] + rng.choice(snippets) + source[end:]
+
+        tree, _ = detector.parse_file(str(path), source)
+        fresh = smell_detector.get_parser().parse(source)
+        assert str(tree.root_node) == str(fresh.root_node)
+        assert tree.root_node.end_byte == fresh.root_node.end_byte
+
+
+def test_detect_deep_nesting_reports_exact_depth(detector, tmp_path):
+    body = ''.join('    ' * (level + 1) + 'if x:\n' for level in range(9))
+    path = tmp_path / 'nested.py'
+    path.write_text('def nested(x):\n' + body + '    ' * 10 + 'pass\n')
+
+    [smell] = detector.analyze_file(str(path))
+    tree, _ = detector.parse_file(str(path))
+    [func] = detector.get_function_nodes(tree)
+    direct = detector.detect_deep_nesting(func)
+
+    assert smell.details['nesting_depth'] == direct.details['nesting_depth'] == 9
+    assert direct.message == smell.message
+    assert detector.detect_deep_nesting(func, threshold=9) is None
+
+
+def test_result_cache_is_bounded(tmp_path):
+    detector = PrimitiveCodeSmellDetector()
+    detector.MAX_CACHED_RESULTS = 3
+    for i in range(10):
+        path = tmp_path / f'module{i}.py'
+        path.write_text(f'def f{i}(a):\n    return a\n')
+        detector.analyze_file(str(path))
+
+    assert len(detector._file_cache) == 3
+
+
+def test_disk_cache_round_trip_and_corrupt_entry(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    path = tmp_path / 'sample.py'
+    path.write_text(FIXTURE)
+
+    assert _summary(PrimitiveCodeSmellDetector(str(cache_dir)).analyze_file(str(path))) == EXPECTED
+    [entry] = cache_dir.iterdir()
+    assert _summary(PrimitiveCodeSmellDetector(str(cache_dir)).analyze_file(str(path))) == EXPECTED
+
+    # A corrupt entry is a miss: the file is re-analyzed and the entry rewritten
+    entry.write_bytes(b'\x80\x04\x95garbage')
+    assert _summary(PrimitiveCodeSmellDetector(str(cache_dir)).analyze_file(str(path))) == EXPECTED
+    assert PrimitiveCodeSmellDetector(str(cache_dir))._load_cached(bytes.fromhex(entry.stem)) is not None
+
+
+def test_smell_table_behaves_like_a_list(detector, tmp_path):
+    path = tmp_path / 'sample.py'
+    path.write_text(FIXTURE)
+    smells = detector.analyze_file(str(path))
+    as_list = list(smells)
+
+    assert smells == as_list
+    assert smells[0:2] == as_list[0:2]
+    assert smells + as_list[:1] == as_list + as_list[:1]
+    assert as_list[:1] + smells == as_list[:1] + as_list
+
+    table = SmellTable(as_list[:1])
+    table.append(as_list[1])
+    table.extend(smells[2:])
+    assert table == smells
+
+    with pytest.raises(ValueError):
+        table.append(CodeSmell('god_class', 'high', (0, 0), 'X', 'too big', {}))
+
+
+def test_print_report_accepts_lists(detector, tmp_path, capsys):
+    path = tmp_path / 'sample.py'
+    path.write_text(FIXTURE)
+    smells = detector.analyze_file(str(path))
+
+    detector.print_report({'sample.py': smells})
+    from_table = capsys.readouterr().out
+    detector.print_report({'sample.py': list(smells)})
+
+    assert capsys.readouterr().out == from_table
+    assert 'DEEP_NESTING [high]' in from_table